@@ -4,62 +4,72 @@ Circular Buffer Interaction Log (Thread-Safe)
 Memory-bounded log for tracking agent interactions.
 Useful for debugging, analytics, and OASF heartbeat data.
 
+Backed by a bounded deque: appends and snapshots are single C calls that are
+atomic under the GIL, so concurrent writers never block on a Python lock.
+Entries are fixed-shape slotted records; timestamps are stored as epoch
+nanoseconds and only formatted on read.
+
 Usage:
     from interaction_log import InteractionLog
 
     log = InteractionLog(max_size=1000)
     log.add(type="mcp", tool="getPrice", duration=150)
     recent = log.get_recent(10)
+
+    `type` is required. `tool`, `duration` and any other keywords are
+    optional and only appear in get_recent() entries when they were given.
 """
 
-import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Any
 
 
+@dataclass(slots=True)
+class LogEntry:
+    timestamp: int
+    type: str
+    tool: str | None = None
+    duration: float | None = None
+    extra: dict[str, Any] | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        data: dict[str, Any] = {
+            "timestamp": datetime.fromtimestamp(self.timestamp / 1e9, timezone.utc).isoformat(),
+            "type": self.type,
+        }
+        if self.tool is not None:
+            data["tool"] = self.tool
+        if self.duration is not None:
+            data["duration"] = self.duration
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+
 class InteractionLog:
     def __init__(self, max_size: int = 1000):
-        self._buffer: list[dict[str, Any] | None] = [None] * max_size
-        self._max_size = max_size
-        self._head = 0
-        self._count = 0
-        self._lock = threading.Lock()
+        self._buffer: deque[LogEntry] = deque(maxlen=max_size)
 
-    def add(self, **kwargs: Any) -> None:
-        entry = {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-            **kwargs,
-        }
-        with self._lock:
-            self._buffer[self._head] = entry
-            self._head = (self._head + 1) % self._max_size
-            if self._count < self._max_size:
-                self._count += 1
+    def add(self, *, tool: str | None = None, duration: float | None = None, **extra: Any) -> None:
+        try:
+            kind = extra.pop("type")
+        except KeyError:
+            raise TypeError("add() missing required keyword argument: 'type'") from None
+        self._buffer.append(LogEntry(time.time_ns(), kind, tool, duration, extra or None))
 
     def get_recent(self, n: int = 10) -> list[dict[str, Any]]:
-        with self._lock:
-            result = []
-            count = min(n, self._count)
-            start = (self._head - count + self._max_size) % self._max_size
-            for i in range(count):
-                idx = (start + i) % self._max_size
-                entry = self._buffer[idx]
-                if entry is not None:
-                    result.append(entry)
-            return result
+        if n <= 0:
+            return []
+        snapshot = list(self._buffer)
+        return [entry.to_dict() for entry in snapshot[-n:]]
 
     def get_stats(self) -> dict[str, Any]:
-        with self._lock:
-            by_type: dict[str, int] = {}
-            for i in range(self._count):
-                idx = (self._head - self._count + i + self._max_size) % self._max_size
-                entry = self._buffer[idx]
-                if entry and "type" in entry:
-                    t = entry["type"]
-                    by_type[t] = by_type.get(t, 0) + 1
-            return {"total": self._count, "by_type": by_type}
+        snapshot = list(self._buffer)
+        by_type = Counter(entry.type for entry in snapshot)
+        return {"total": len(snapshot), "by_type": dict(by_type)}
 
     def clear(self) -> None:
-        with self._lock:
-            self._head = 0
-            self._count = 0
+        self._buffer.clear()
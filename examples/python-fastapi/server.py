@@ -12,23 +12,51 @@ After deploying, register on-chain:
     CHAIN=base-sepolia PRIVATE_KEY=$KEY ./scripts/register.sh https://YOUR-URL/registration.json
 """
 
-import json
+import hashlib
+import mimetypes
 import os
 import time
+from contextlib import asynccontextmanager
+from functools import lru_cache
 from pathlib import Path
 from datetime import datetime, timezone
+from email.utils import formatdate
+from typing import Any, Callable
 
+import orjson
 from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse, JSONResponse, FileResponse
+from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 
+from x402_middleware import close_x402, init_x402
+
 # ---------- Setup ----------
 
 BASE_DIR = Path(__file__).parent
-REGISTRATION = json.loads((BASE_DIR / "registration.json").read_text())
+REGISTRATION = orjson.loads((BASE_DIR / "registration.json").read_bytes())
 VERSION = "1.0.0"
 
-app = FastAPI(title=REGISTRATION["name"], version=VERSION)
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson (C encoder, emits bytes directly)."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await init_x402()
+    yield
+    await close_x402()
+
+
+app = FastAPI(
+    title=REGISTRATION["name"],
+    version=VERSION,
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan,
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -37,6 +65,112 @@ app.add_middleware(
     allow_headers=["Content-Type"],
 )
 
+# ---------- Precomputed responses ----------
+# Static payloads are serialized once at import instead of on every request.
+
+
+@lru_cache(maxsize=1)
+def _iso_timestamp(second: int) -> str:
+    return datetime.fromtimestamp(second, timezone.utc).isoformat()
+
+
+def utc_now_iso() -> str:
+    """Current UTC time as ISO-8601, formatted at most once per second."""
+    return _iso_timestamp(int(time.time()))
+
+
+REGISTRATION_BYTES = orjson.dumps(REGISTRATION)
+
+
+@lru_cache(maxsize=1)
+def _health_bytes(second: int) -> bytes:
+    return orjson.dumps({
+        "status": "ok",
+        "agent": REGISTRATION["name"],
+        "version": VERSION,
+        "timestamp": _iso_timestamp(second),
+    })
+
+
+_domain_verify_path = BASE_DIR / ".well-known" / "agent-registration.json"
+DOMAIN_VERIFY_BYTES = (
+    orjson.dumps(orjson.loads(_domain_verify_path.read_bytes()))
+    if _domain_verify_path.is_file()
+    else None
+)
+DOMAIN_VERIFY_NOT_FOUND = orjson.dumps({"error": "Verification file not found"})
+
+_dashboard_path = BASE_DIR / "dashboard.html"
+DASHBOARD_HTML = (
+    _dashboard_path.read_bytes() if _dashboard_path.is_file() else b"<h1>Agent is running</h1>"
+)
+
+# Files in public/, keyed by filename (together they double as an allow-list).
+# Small ones (the agent image) are held in memory with their validators; larger
+# ones are streamed by FileResponse from the stat taken here.
+STATIC_CACHE_MAX_BYTES = 256 * 1024
+STATIC_CACHE: dict[str, tuple[bytes, str, dict[str, str]]] = {}
+STATIC_FILES: dict[str, tuple[Path, os.stat_result]] = {}
+
+
+def _stat_headers(st: os.stat_result) -> dict[str, str]:
+    """ETag / Last-Modified computed the same way FileResponse does."""
+    etag_base = f"{st.st_mtime}-{st.st_size}"
+    return {
+        "etag": f'"{hashlib.md5(etag_base.encode(), usedforsecurity=False).hexdigest()}"',
+        "last-modified": formatdate(st.st_mtime, usegmt=True),
+    }
+
+
+_public_dir = BASE_DIR / "public"
+for _path in _public_dir.iterdir() if _public_dir.is_dir() else ():
+    if not _path.is_file():
+        continue
+    _st = _path.stat()
+    if _st.st_size > STATIC_CACHE_MAX_BYTES:
+        STATIC_FILES[_path.name] = (_path, _st)
+        continue
+    STATIC_CACHE[_path.name] = (
+        _path.read_bytes(),
+        mimetypes.guess_type(_path.name)[0] or "application/octet-stream",
+        _stat_headers(_st),
+    )
+FILE_NOT_FOUND = orjson.dumps({"error": "File not found"})
+
+# ---------- Request bodies ----------
+# POST bodies are capped before they are buffered or parsed.
+
+MAX_BODY_BYTES = 64 * 1024
+PAYLOAD_TOO_LARGE = orjson.dumps({"error": "Payload too large"})
+BAD_CONTENT_LENGTH = orjson.dumps({"error": "Invalid Content-Length header"})
+
+
+async def read_body_limited(request: Request) -> bytes | Response:
+    """Read the request body, or return the error Response to send instead.
+
+    413 when the body exceeds MAX_BODY_BYTES, 400 for a malformed Content-Length.
+    """
+    length = request.headers.get("content-length")
+    if length is not None:
+        try:
+            declared = int(length)
+        except ValueError:
+            declared = -1
+        if declared < 0:
+            return Response(BAD_CONTENT_LENGTH, status_code=400, media_type="application/json")
+        if declared > MAX_BODY_BYTES:
+            return Response(PAYLOAD_TOO_LARGE, status_code=413, media_type="application/json")
+    chunks = []
+    size = 0
+    # Content-Length can be absent (chunked uploads), so count while streaming too.
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > MAX_BODY_BYTES:
+            return Response(PAYLOAD_TOO_LARGE, status_code=413, media_type="application/json")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
 # ============================================================
 # FREE PUBLIC ENDPOINTS
 # ============================================================
@@ -44,73 +178,78 @@ app.add_middleware(
 @app.get("/", response_class=HTMLResponse)
 async def dashboard():
     """Visual dashboard — what users see when clicking your agent in the scanner."""
-    html_path = BASE_DIR / "dashboard.html"
-    if html_path.exists():
-        return HTMLResponse(html_path.read_text())
-    return HTMLResponse("<h1>Agent is running</h1>")
+    return HTMLResponse(DASHBOARD_HTML)
 
 
 @app.get("/api/health")
 async def health():
     """Health check for Railway and monitoring."""
-    return {
-        "status": "ok",
-        "agent": REGISTRATION["name"],
-        "version": VERSION,
-        "timestamp": datetime.now(timezone.utc).isoformat(),
-    }
+    return Response(_health_bytes(int(time.time())), media_type="application/json")
 
 
 @app.get("/registration.json")
 async def registration():
     """ERC-8004 agent metadata."""
-    return JSONResponse(REGISTRATION)
+    return Response(REGISTRATION_BYTES, media_type="application/json")
 
 
 @app.get("/.well-known/agent-card.json")
 async def agent_card():
     """A2A agent card — same as registration for discovery."""
-    return JSONResponse(REGISTRATION)
+    return Response(REGISTRATION_BYTES, media_type="application/json")
 
 
 @app.get("/.well-known/agent-registration.json")
 async def domain_verification():
     """Domain verification for scanners."""
-    path = BASE_DIR / ".well-known" / "agent-registration.json"
-    if path.exists():
-        return JSONResponse(json.loads(path.read_text()))
-    return JSONResponse({"error": "Verification file not found"}, status_code=404)
+    if DOMAIN_VERIFY_BYTES is None:
+        return Response(DOMAIN_VERIFY_NOT_FOUND, status_code=404, media_type="application/json")
+    return Response(DOMAIN_VERIFY_BYTES, media_type="application/json")
 
 
 @app.get("/public/{filename}")
-async def serve_static(filename: str):
+async def serve_static(filename: str, request: Request):
     """Serve agent image and static files."""
-    file_path = BASE_DIR / "public" / filename
-    if not file_path.exists():
-        return JSONResponse({"error": "File not found"}, status_code=404)
-    return FileResponse(file_path)
+    hit = STATIC_CACHE.get(filename)
+    if hit is not None:
+        body, media_type, headers = hit
+        if_none_match = request.headers.get("if-none-match", "")
+        if headers["etag"] in (tag.strip() for tag in if_none_match.split(",")):
+            return Response(status_code=304, headers=headers)
+        return Response(body, media_type=media_type, headers=headers)
+    large = STATIC_FILES.get(filename)
+    if large is not None:
+        return FileResponse(large[0], stat_result=large[1])
+    return Response(FILE_NOT_FOUND, status_code=404, media_type="application/json")
 
 
 # ============================================================
 # OASF ENDPOINT
 # ============================================================
 
+OASF = {
+    "name": REGISTRATION["name"],
+    "description": REGISTRATION.get("description", ""),
+    "version": VERSION,
+    "skills": [
+        "natural_language_processing/information_retrieval_synthesis/search",
+        "tool_interaction/api_schema_understanding",
+    ],
+    "domains": [
+        "technology/blockchain",
+    ],
+}
+
+
+@lru_cache(maxsize=1)
+def _oasf_bytes(second: int) -> bytes:
+    return orjson.dumps({**OASF, "updatedAt": _iso_timestamp(second)})
+
+
 @app.get("/oasf")
 async def oasf():
     """Open Agent Service Framework — skills and domains for discovery."""
-    return {
-        "name": REGISTRATION["name"],
-        "description": REGISTRATION.get("description", ""),
-        "version": VERSION,
-        "skills": [
-            "natural_language_processing/information_retrieval_synthesis/search",
-            "tool_interaction/api_schema_understanding",
-        ],
-        "domains": [
-            "technology/blockchain",
-        ],
-        "updatedAt": datetime.now(timezone.utc).isoformat(),
-    }
+    return Response(_oasf_bytes(int(time.time())), media_type="application/json")
 
 
 # ============================================================
@@ -137,75 +276,146 @@ MCP_TOOLS = [
     # Add your own tools here
 ]
 
+# Results that never change are serialized once; only the request id varies.
+INITIALIZE_RESULT = orjson.dumps({
+    "protocolVersion": "2025-11-25",
+    "capabilities": {"tools": {}},
+    "serverInfo": {"name": f"{REGISTRATION['name']} MCP", "version": VERSION},
+})
+TOOLS_LIST_RESULT = orjson.dumps({"tools": MCP_TOOLS})
+AGENT_INFO_TEXT = orjson.dumps({
+    "name": REGISTRATION["name"],
+    "description": REGISTRATION.get("description", ""),
+    "version": VERSION,
+    "capabilities": REGISTRATION.get("capabilities", []),
+    "services": [s["name"] for s in REGISTRATION.get("services", [])],
+}).decode()
+
+
+def _rpc_ok(req_id: Any, result: Any) -> Response:
+    return FastJSONResponse({"jsonrpc": "2.0", "id": req_id, "result": result})
+
+
+def _rpc_ok_raw(req_id: Any, result: bytes) -> Response:
+    body = b'{"jsonrpc":"2.0","id":' + orjson.dumps(req_id) + b',"result":' + result + b"}"
+    return Response(body, media_type="application/json")
+
+
+def _rpc_err(req_id: Any, code: int, message: str) -> Response:
+    return FastJSONResponse({"jsonrpc": "2.0", "id": req_id, "error": {"code": code, "message": message}})
+
+
+def _tool_get_agent_info(args: dict) -> str:
+    return AGENT_INFO_TEXT
+
+
+def _tool_ping(args: dict) -> str:
+    return orjson.dumps({
+        "pong": True,
+        "message": args.get("message", f"Hello from {REGISTRATION['name']}"),
+        "timestamp": utc_now_iso(),
+    }).decode()
+
+
+# Tool name -> handler returning the text content of the tools/call result.
+TOOL_HANDLERS: dict[str, Callable[[dict], str]] = {
+    "get_agent_info": _tool_get_agent_info,
+    "ping": _tool_ping,
+    # Register your own tools here (and describe them in MCP_TOOLS)
+}
+
+
+def _mcp_initialize(req_id: Any, params: dict) -> Response:
+    return _rpc_ok_raw(req_id, INITIALIZE_RESULT)
+
+
+def _mcp_tools_list(req_id: Any, params: dict) -> Response:
+    return _rpc_ok_raw(req_id, TOOLS_LIST_RESULT)
+
+
+def _mcp_tools_call(req_id: Any, params: dict) -> Response:
+    tool_name = params.get("name")
+    handler = TOOL_HANDLERS.get(tool_name) if isinstance(tool_name, str) else None
+    if handler is None:
+        return _rpc_err(req_id, -32601, f"Tool not found: {tool_name}")
+    text = handler(params.get("arguments", {}))
+    return _rpc_ok(req_id, {"content": [{"type": "text", "text": text}]})
+
+
+def _valid_rpc_id(req_id: Any) -> bool:
+    """Ids we can echo back exactly.
+
+    orjson decodes integers wider than 64 bits as floats, so an integral float
+    at or beyond 2**53 may be a mangled integer id and is refused. Other
+    floats, strings, null and ints (orjson keeps int64/uint64 exact) are fine.
+    """
+    if req_id is None or isinstance(req_id, str):
+        return True
+    if type(req_id) is int:
+        return -(2**63) <= req_id < 2**64
+    if type(req_id) is float:
+        return not (req_id.is_integer() and abs(req_id) >= 2**53)
+    return False
+
+
+MCP_METHODS: dict[str, Callable[[Any, dict], Response]] = {
+    "initialize": _mcp_initialize,
+    "tools/list": _mcp_tools_list,
+    "tools/call": _mcp_tools_call,
+}
+
 
 @app.post("/mcp")
 async def mcp_handler(request: Request):
     """MCP JSON-RPC 2.0 endpoint."""
+    raw = await read_body_limited(request)
+    if isinstance(raw, Response):
+        return raw
     try:
-        body = await request.json()
+        body = orjson.loads(raw)
     except Exception:
-        return JSONResponse(
-            {"jsonrpc": "2.0", "id": None, "error": {"code": -32700, "message": "Parse error"}}
-        )
+        return _rpc_err(None, -32700, "Parse error")
+
+    if not isinstance(body, dict) or not _valid_rpc_id(body.get("id")):
+        return _rpc_err(None, -32600, "Invalid Request")
 
     method = body.get("method")
     req_id = body.get("id")
     params = body.get("params", {})
 
-    def rpc_ok(result):
-        return JSONResponse({"jsonrpc": "2.0", "id": req_id, "result": result})
-
-    def rpc_err(code, message):
-        return JSONResponse({"jsonrpc": "2.0", "id": req_id, "error": {"code": code, "message": message}})
-
-    if method == "initialize":
-        return rpc_ok({
-            "protocolVersion": "2025-11-25",
-            "capabilities": {"tools": {}},
-            "serverInfo": {"name": f"{REGISTRATION['name']} MCP", "version": VERSION},
-        })
-
-    if method == "tools/list":
-        return rpc_ok({"tools": MCP_TOOLS})
-
-    if method == "tools/call":
-        tool_name = params.get("name")
-        args = params.get("arguments", {})
-
-        if tool_name == "get_agent_info":
-            result = {
-                "name": REGISTRATION["name"],
-                "description": REGISTRATION.get("description", ""),
-                "version": VERSION,
-                "capabilities": REGISTRATION.get("capabilities", []),
-                "services": [s["name"] for s in REGISTRATION.get("services", [])],
-            }
-        elif tool_name == "ping":
-            result = {
-                "pong": True,
-                "message": args.get("message", f"Hello from {REGISTRATION['name']}"),
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-            }
-        else:
-            return rpc_err(-32601, f"Tool not found: {tool_name}")
-
-        return rpc_ok({"content": [{"type": "text", "text": json.dumps(result)}]})
-
-    return rpc_err(-32601, f"Method not supported: {method}")
+    handler = MCP_METHODS.get(method) if isinstance(method, str) else None
+    if handler is None:
+        return _rpc_err(req_id, -32601, f"Method not supported: {method}")
+    return handler(req_id, params)
 
 
 # ============================================================
 # A2A ENDPOINT
 # ============================================================
 
+def _ask_question(raw: bytes) -> str | None:
+    """First truthy of question/message/input, accepted only if it is a string."""
+    try:
+        # orjson.JSONDecodeError (bad JSON or bad UTF-8) is a ValueError.
+        body = orjson.loads(raw)
+    except ValueError:
+        return None
+    if not isinstance(body, dict):
+        return None
+    question = body.get("question") or body.get("message") or body.get("input")
+    return question if isinstance(question, str) else None
+
+
 @app.post("/a2a/ask")
 async def a2a_ask(request: Request):
     """A2A natural language endpoint."""
-    body = await request.json()
-    question = body.get("question") or body.get("message") or body.get("input")
+    raw = await read_body_limited(request)
+    if isinstance(raw, Response):
+        return raw
+    question = _ask_question(raw)
 
-    if not question or not isinstance(question, str):
-        return JSONResponse(
+    if not question:
+        return FastJSONResponse(
             {"error": "Missing 'question' field", "usage": {"method": "POST", "body": {"question": "Your question here"}}},
             status_code=400,
         )
@@ -239,4 +449,6 @@ if __name__ == "__main__":
     print("  GET  /oasf                    OASF discovery")
     print()
 
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    # uvicorn[standard] already auto-selects uvloop/httptools when available.
+    # The per-request access log is off on purpose.
+    uvicorn.run(app, host="0.0.0.0", port=port, access_log=False)
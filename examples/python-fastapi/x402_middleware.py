@@ -11,15 +11,28 @@ Usage:
     @require_x402_payment(price=10000)
     async def premium_endpoint(request: Request):
         return {"data": "premium content"}
+
+Facilitator calls share one keep-alive HTTP client. Open and close it from
+the app lifespan with init_x402() / close_x402().
 """
 
 import base64
-import json
 import os
+import time
 from functools import wraps
+from typing import Literal
 
+import httpx
+import msgspec
+import orjson
 from fastapi import Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import Response
+
+try:
+    import h2  # noqa: F401 -- optional, lets httpx speak HTTP/2 (httpx[http2])
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
 
 DEFAULT_USDC = {
     "avalanche": "0xB97EF9Ef8734C71904D8002F8b6Bc66Dd9c48a6E",
@@ -32,6 +45,45 @@ DEFAULT_USDC = {
 
 DEFAULT_FACILITATOR = "https://facilitator.ultravioletadao.xyz"
 
+_INVALID_PAYMENT_BODY = orjson.dumps({"error": "Invalid or expired payment"})
+
+_CLIENT: httpx.AsyncClient | None = None
+
+
+# Typed shape of the decoded X-PAYMENT header. Decoding validates it in one
+# pass; unknown fields are ignored and the raw bytes are what get forwarded.
+class PaymentTerms(msgspec.Struct):
+    to: str
+    amount: int | str
+    validBefore: int
+
+
+class PaymentEnvelope(msgspec.Struct):
+    payload: PaymentTerms
+
+
+class X402Payment(msgspec.Struct):
+    x402Version: Literal[1]
+    payload: PaymentEnvelope
+
+
+_PAYMENT_DECODER = msgspec.json.Decoder(X402Payment)
+
+
+async def init_x402() -> None:
+    """Open the shared facilitator client (reuses connections across payments)."""
+    global _CLIENT
+    if _CLIENT is None:
+        _CLIENT = httpx.AsyncClient(timeout=30, http2=_HTTP2)
+
+
+async def close_x402() -> None:
+    """Close the shared facilitator client."""
+    global _CLIENT
+    if _CLIENT is not None:
+        await _CLIENT.aclose()
+        _CLIENT = None
+
 
 def require_x402_payment(
     price: int,
@@ -46,32 +98,35 @@ def require_x402_payment(
     net = network or os.environ.get("X402_NETWORK", "avalanche")
     usdc = asset or DEFAULT_USDC.get(net, DEFAULT_USDC["avalanche"])
     wallet = recipient or os.environ.get("X402_RECIPIENT", "")
+    wallet_lower = wallet.lower()
     fac_url = facilitator_url or DEFAULT_FACILITATOR
 
+    # The 402 challenge is identical for every unpaid request to this endpoint.
+    # Only the bytes are shared: FastAPI attaches per-request background tasks
+    # to the returned Response, so each request gets a fresh object.
+    payment_required_body = orjson.dumps({
+        "error": "Payment Required",
+        "x402": {
+            "version": 1,
+            "amount": str(price),
+            "asset": usdc,
+            "recipient": wallet,
+            "network": net,
+            "facilitator": fac_url,
+            "description": description,
+        },
+    })
+
     def decorator(func):
         @wraps(func)
         async def wrapper(request: Request, *args, **kwargs):
-            payment_header = request.headers.get("X-PAYMENT")
+            payment_header = request.headers.get("x-payment")
 
             if not payment_header:
-                return JSONResponse(
-                    {
-                        "error": "Payment Required",
-                        "x402": {
-                            "version": 1,
-                            "amount": str(price),
-                            "asset": usdc,
-                            "recipient": wallet,
-                            "network": net,
-                            "facilitator": fac_url,
-                            "description": description,
-                        },
-                    },
-                    status_code=402,
-                )
-
-            if not await _verify_payment(payment_header, price, wallet, fac_url):
-                return JSONResponse({"error": "Invalid or expired payment"}, status_code=403)
+                return Response(payment_required_body, status_code=402, media_type="application/json")
+
+            if not await _verify_payment(payment_header, price, wallet_lower, fac_url):
+                return Response(_INVALID_PAYMENT_BODY, status_code=403, media_type="application/json")
 
             return await func(request, *args, **kwargs)
 
@@ -80,30 +135,30 @@ def require_x402_payment(
     return decorator
 
 
-async def _verify_payment(header: str, min_price: int, recipient: str, facilitator: str) -> bool:
-    try:
-        import httpx
-
-        payment = json.loads(base64.b64decode(header).decode("utf-8"))
+async def _verify_payment(header: str, min_price: int, recipient_lower: str, facilitator: str) -> bool:
+    # Outside the try below: a client setup failure must surface, not read as a bad payment.
+    if _CLIENT is None:
+        await init_x402()
 
-        if payment.get("x402Version") != 1:
-            return False
+    try:
+        raw = base64.b64decode(header)
+        terms = _PAYMENT_DECODER.decode(raw).payload.payload
 
-        payload = payment.get("payload", {}).get("payload", {})
-        if payload.get("to", "").lower() != recipient.lower():
+        if terms.to.lower() != recipient_lower:
             return False
 
-        amount = int(payload.get("amount", "0"))
-        if amount < min_price:
+        if int(terms.amount) < min_price:
             return False
 
-        import time
-        if time.time() > payload.get("validBefore", 0):
+        if time.time() > terms.validBefore:
             return False
 
-        async with httpx.AsyncClient(timeout=30) as client:
-            resp = await client.post(f"{facilitator}/verify", json=payment)
-            return resp.status_code == 200
+        resp = await _CLIENT.post(
+            f"{facilitator}/verify",
+            content=raw,
+            headers={"Content-Type": "application/json"},
+        )
+        return resp.status_code == 200
 
     except Exception:
         return False